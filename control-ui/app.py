@@ -2,19 +2,34 @@ from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 import docker
 import os
+import errno
 import yaml
+import json
+import copy
+import io
 import subprocess
+import shutil
+import tempfile
 import time
 import socket
+import asyncio
+import re
 import threading
-from kafka import KafkaAdminClient, KafkaConsumer
+import atexit
+from kafka import KafkaAdminClient
 from kafka.admin import NewTopic
 from kafka.errors import TopicAlreadyExistsError, UnknownTopicOrPartitionError
 import logging
+from dotenv import dotenv_values
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple, defaultdict
 
-import copy
+# Prefer the libyaml-backed C loader/dumper, fall back to pure Python
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+BaseDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
-class NoAliasDumper(yaml.SafeDumper):
+class NoAliasDumper(BaseDumper):
     def ignore_aliases(self, data):
         return True
 
@@ -25,57 +40,236 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Docker client
-docker_client = docker.from_env()
+if not yaml.__with_libyaml__:
+    logger.warning("PyYAML was built without libyaml, docker-compose.yml parsing uses the slow pure-Python loader")
+
+# Docker client - one shared instance for the whole app; its connection pool re-dials the
+# socket by itself, so only the initial connect needs retrying (daemon may still be starting)
+def _connect_docker(attempts=5, delay=2):
+    for attempt in range(1, attempts + 1):
+        try:
+            return docker.from_env(timeout=30)
+        except docker.errors.DockerException as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"Docker not reachable (attempt {attempt}/{attempts}): {e}")
+            time.sleep(delay)
+
+docker_client = _connect_docker()
 
 # Constants
+DOCKER_WORKERS = 8  # Parallel Docker API calls for multi-container operations
 DOCKER_COMPOSE_PATH = '/app/docker-compose.yml'
+ENV_FILE_PATH = '/app/.env'
+DOCKER_COMPOSE_BIN = shutil.which('docker-compose') or 'docker-compose'  # Resolved once, run without a shell
+# Label on every playground volume, so cleanup can select them daemon-side
+VOLUME_LABEL = 'project=kafka-playground'
+COMPOSE_JSON_PATH = DOCKER_COMPOSE_PATH + '.json'  # Parsed copy, much faster to load than YAML
 DEFAULT_CLUSTER_ID = 'default'
 
+# Address of the first PLAINTEXT listener in KAFKA_ADVERTISED_LISTENERS
+_PLAINTEXT_RE = re.compile(r'PLAINTEXT://([^,\s]+)')
+
+# ${VAR} / ${VAR:-default} references in compose values
+_ENV_VAR_RE = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)(?::?-([^}]*))?\}')
+
+# Broker service/container names: legacy "kafkaN" (default cluster) or "kafka-{cluster_id}-{N}"
+_BROKER_RE = re.compile(r'^kafka(?:(\d+)|-([^-]+)-(\d+))$')
+
+@lru_cache(maxsize=1024)
+def classify_service(name):
+    """Return (cluster_id, broker_id) for a broker service name, or None for anything else"""
+    m = _BROKER_RE.match(name)
+    if not m:
+        return None
+    if m.group(1) is not None:
+        return (DEFAULT_CLUSTER_ID, int(m.group(1)))
+    return (m.group(2), int(m.group(3)))
+
+# One broker service from docker-compose.yml. external_port is the host side of the first port
+# mapping (None without ports), advertised_listener the PLAINTEXT address (None if missing).
+BrokerRec = namedtuple('BrokerRec', ['name', 'broker_id', 'external_port', 'advertised_listener'])
+
+# Parsed docker-compose.yml, keyed by (mtime_ns, size) of the file on disk.
+# Derived from the same parse: 'used_ports' holds the fixed host ports, 'port_usage' and
+# 'port_duplicates' map them to services (see index_ports), 'next_hint' is where the next port
+# search starts and 'brokers_by_cluster' maps cluster_id -> [BrokerRec] in compose order.
+_COMPOSE_CACHE = {
+    'key': None, 'data': None,
+    'used_ports': frozenset(), 'port_usage': {}, 'port_duplicates': [], 'next_hint': 0,
+    'brokers_by_cluster': {},
+    'lock': threading.Lock()
+}
+
+def _refresh_compose():
+    """Re-parse docker-compose.yml into the cache if it changed on disk. Caller must hold the cache lock."""
+    st = os.stat(DOCKER_COMPOSE_PATH)
+    key = (st.st_mtime_ns, st.st_size)
+    if _COMPOSE_CACHE['key'] == key:
+        return
+    data = None
+    try:
+        with open(COMPOSE_JSON_PATH, 'r') as f:
+            cached = json.load(f)
+        # Only trust the sidecar if it was made from exactly this file (mtime alone misses cp -p/rsync -a restores)
+        if isinstance(cached, dict) and cached.get('key') == list(key):
+            data = cached['data']
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable compose JSON cache: {e}")
+    if data is None:
+        with open(DOCKER_COMPOSE_PATH, 'r') as f:
+            data = yaml.load(f, Loader=Loader) or {}
+        write_compose_sidecar(data, key)
+    port_usage, duplicates = index_ports(data)
+    used_ports = frozenset(port_usage)
+    if not used_ports >= _COMPOSE_CACHE['used_ports']:
+        # Ports were freed, search from the start again
+        _COMPOSE_CACHE['next_hint'] = 0
+    _COMPOSE_CACHE['data'] = data
+    _COMPOSE_CACHE['used_ports'] = used_ports
+    _COMPOSE_CACHE['port_usage'] = port_usage
+    _COMPOSE_CACHE['port_duplicates'] = duplicates
+    _COMPOSE_CACHE['brokers_by_cluster'] = index_brokers(data)
+    _COMPOSE_CACHE['key'] = key
+
+def load_compose():
+    """Return a private copy of the parsed docker-compose.yml, re-parsing only when the file changed"""
+    with _COMPOSE_CACHE['lock']:
+        _refresh_compose()
+        return fast_clone(_COMPOSE_CACHE['data'])
+
+def compose_port_usage():
+    """(port_usage, duplicates) of the cached compose file, see index_ports. Shared, do not modify."""
+    with _COMPOSE_CACHE['lock']:
+        _refresh_compose()
+        return _COMPOSE_CACHE['port_usage'], _COMPOSE_CACHE['port_duplicates']
+
+def compose_brokers(cluster_id=None):
+    """Broker records from the cached compose file: a list for one cluster, or the whole index"""
+    with _COMPOSE_CACHE['lock']:
+        _refresh_compose()
+        index = _COMPOSE_CACHE['brokers_by_cluster']
+        if cluster_id is None:
+            return {cid: list(recs) for cid, recs in index.items()}
+        return list(index.get(cluster_id, []))
+
+def fast_clone(obj):
+    """Deep copy via a JSON round-trip, far cheaper than copy.deepcopy for plain compose data"""
+    try:
+        return json.loads(json.dumps(obj))
+    except TypeError:
+        # YAML can yield values JSON cannot hold, e.g. an unquoted date in environment:
+        return copy.deepcopy(obj)
+
+def write_compose_sidecar(compose_data, key):
+    """Write the JSON copy of docker-compose.yml, tagged with the (mtime_ns, size) key of the YAML it matches.
+    Failures are non-fatal, we just fall back to YAML."""
+    try:
+        # Serialize before touching the file, and swap it in whole, so a failure never leaves it truncated
+        content = json.dumps({'key': list(key), 'data': compose_data})
+        tmp_path = COMPOSE_JSON_PATH + '.tmp'
+        with open(tmp_path, 'w') as j:
+            j.write(content)
+        os.replace(tmp_path, COMPOSE_JSON_PATH)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write compose JSON cache: {e}")
+
+def index_brokers(compose_data):
+    """Walk the services once and group broker records by cluster"""
+    brokers_by_cluster = {}
+    for service_name, service in (compose_data.get('services') or {}).items():
+        broker = classify_service(service_name)
+        if not broker:
+            continue
+        # Assumption: first port mapping is EXTERNAL_PORT:9092
+        ports = service.get('ports') or []
+        external_port = str(ports[0]).split(':')[0] if ports else None
+        # Control-ui is inside the network, so use the PLAINTEXT listener (container name : internal port)
+        # Example: PLAINTEXT://kafka1:29092 -> kafka1:29092
+        listeners = (service.get('environment') or {}).get('KAFKA_ADVERTISED_LISTENERS', '')
+        m = _PLAINTEXT_RE.search(str(listeners))
+        brokers_by_cluster.setdefault(broker[0], []).append(
+            BrokerRec(service_name, broker[1], external_port, m.group(1) if m else None)
+        )
+    return brokers_by_cluster
+
+# Running brokers discovered from Docker events: cluster_id -> {container name: (broker_id, address)}
+_RUNNING_BROKERS = {}
+_RUNNING_BROKERS_LOCK = threading.Lock()
+_DISCOVERY_READY = threading.Event()  # Set once _RUNNING_BROKERS reflects the daemon's state
+
+def _container_bootstrap_addr(container):
+    """PLAINTEXT address advertised by a broker container, read from its environment"""
+    for item in container.attrs.get('Config', {}).get('Env') or []:
+        key, _, value = item.partition('=')
+        if key == 'KAFKA_ADVERTISED_LISTENERS':
+            m = _PLAINTEXT_RE.search(value)
+            return m.group(1) if m else None
+    return None
+
+def _track_broker(container):
+    broker = classify_service(container.name)
+    addr = _container_bootstrap_addr(container)
+    if broker and addr:
+        with _RUNNING_BROKERS_LOCK:
+            _RUNNING_BROKERS.setdefault(broker[0], {})[container.name] = (broker[1], addr)
+
+def _untrack_broker(name):
+    broker = classify_service(name)
+    if broker:
+        with _RUNNING_BROKERS_LOCK:
+            _RUNNING_BROKERS.get(broker[0], {}).pop(name, None)
+
+def _broker_watcher():
+    """Keep _RUNNING_BROKERS current from the Docker event stream, re-syncing after stream errors"""
+    while True:
+        try:
+            events = docker_client.events(decode=True, filters={'type': 'container', 'event': ['start', 'stop', 'die', 'destroy']})
+            # Seed after subscribing so no event between listing and streaming is lost
+            running = docker_client.containers.list(filters={'name': 'kafka'})
+            with _RUNNING_BROKERS_LOCK:
+                _RUNNING_BROKERS.clear()
+            for c in running:
+                _track_broker(c)
+            _DISCOVERY_READY.set()
+
+            for ev in events:
+                name = ev.get('Actor', {}).get('Attributes', {}).get('name')
+                if not name or not classify_service(name):
+                    continue
+                if ev.get('Action') == 'start':
+                    try:
+                        _track_broker(docker_client.containers.get(name))
+                    except docker.errors.NotFound:
+                        continue
+                else:
+                    _untrack_broker(name)
+        except Exception as e:
+            logger.warning(f"Docker event watcher error, resyncing: {e}")
+        _DISCOVERY_READY.clear()
+        time.sleep(5)
+
+threading.Thread(target=_broker_watcher, name='broker-watcher', daemon=True).start()
+
 def get_kafka_bootstrap_servers(cluster_id=DEFAULT_CLUSTER_ID):
     """Dynamically get bootstrap servers for a specific cluster"""
+    # Running brokers known from Docker events; compose is the fallback (e.g. nothing running yet)
+    if _DISCOVERY_READY.is_set():
+        with _RUNNING_BROKERS_LOCK:
+            running = sorted(_RUNNING_BROKERS.get(cluster_id, {}).values())
+        if running:
+            return ','.join(addr for _, addr in running)
+
     try:
         if os.path.exists(DOCKER_COMPOSE_PATH):
-            with open(DOCKER_COMPOSE_PATH, 'r') as f:
-                compose = yaml.safe_load(f)
-            
-            brokers = []
-            for service_name, service in compose.get('services', {}).items():
-                # Filter by cluster logic
-                if cluster_id == DEFAULT_CLUSTER_ID:
-                    # Match old style "kafka1", "kafka2" OR "kafka-default-1"? 
-                    # Let's stick to legacy names "kafkaN" for default cluster
-                     is_target = service_name.startswith('kafka') and service_name != 'kafka-ui' and '-' not in service_name
-                else:
-                    # New style: kafka-{cluster_id}-{broker_id}
-                    is_target = service_name.startswith(f"kafka-{cluster_id}-")
-                
-                if is_target:
-                    try:
-                        # Extract port from ports definition
-                        # Assumption: first port mapping is EXTERNAL_PORT:9092
-                        ports = service.get('ports', [])
-                        if ports:
-                            ext_port = ports[0].split(':')[0]
-                            # Use localhost for internal connectivity check or container name if within network
-                            # Since control-ui is in network, use Service Name : Internal Port?
-                            # But bootstrap_servers usually need accessible address. 
-                            # If we use container names, we need internal ports (2909x)
-                            # Let's parse internal port from KAFKA_ADVERTISED_LISTENERS if possible
-                            env = service.get('environment', {})
-                            listeners = env.get('KAFKA_ADVERTISED_LISTENERS', '')
-                            # Example: PLAINTEXT://kafka1:29092
-                            for l in listeners.split(','):
-                                if 'PLAINTEXT://' in l:
-                                    # Extract kafka1:29092
-                                    addr = l.replace('PLAINTEXT://', '')
-                                    brokers.append(addr)
-                                    break
-                    except Exception:
-                        continue
-            
-            if brokers:
-                return ','.join(brokers)
+            servers = ','.join(
+                b.advertised_listener for b in compose_brokers(cluster_id)
+                if b.external_port is not None and b.advertised_listener
+            )
+            if servers:
+                return servers
     except Exception as e:
         logger.error(f"Error parsing docker-compose for bootstrap servers: {e}")
     
@@ -84,24 +278,97 @@ def get_kafka_bootstrap_servers(cluster_id=DEFAULT_CLUSTER_ID):
         return os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka1:29092,kafka2:29093,kafka3:29094')
     return ""
 
+# Long-lived admin clients: cluster_id -> (client, bootstrap servers, created_at)
+_ADMIN_CACHE = {}
+_ADMIN_CACHE_LOCK = threading.Lock()
+# Per-cluster locks so a slow connect to one cluster does not block requests for the others
+_ADMIN_CONNECT_LOCKS = defaultdict(threading.Lock)
+ADMIN_CACHE_TTL = 60  # seconds before a cached client is replaced
+ADMIN_CLOSE_GRACE = 30  # seconds a replaced client stays open for requests still using it
+
+def _close_admin(admin):
+    try:
+        admin.close()
+    except Exception as e:
+        logger.debug(f"Error closing Kafka admin client: {e}")
+
+def _retire_admin(admin):
+    """Close a client that left the cache once in-flight requests had time to finish with it"""
+    timer = threading.Timer(ADMIN_CLOSE_GRACE, _close_admin, args=(admin,))
+    timer.daemon = True
+    timer.start()
+
+def _cached_admin(cluster_id, servers):
+    """Return the cached client if it is fresh and for the same servers. Caller must hold _ADMIN_CACHE_LOCK."""
+    entry = _ADMIN_CACHE.get(cluster_id)
+    if entry:
+        admin, cached_servers, ts = entry
+        if cached_servers == servers and time.time() - ts < ADMIN_CACHE_TTL:
+            return admin
+    return None
+
 def get_kafka_admin(cluster_id=DEFAULT_CLUSTER_ID):
-    """Get Kafka admin client"""
+    """Get a cached Kafka admin client, reconnecting when stale or the bootstrap servers changed"""
     try:
         servers = get_kafka_bootstrap_servers(cluster_id)
         if not servers: return None
-        return KafkaAdminClient(
-            bootstrap_servers=servers.split(','),
-            client_id=f'control-ui-admin-{cluster_id}',
-            request_timeout_ms=5000
-        )
+        with _ADMIN_CACHE_LOCK:
+            admin = _cached_admin(cluster_id, servers)
+            if admin:
+                return admin
+            connect_lock = _ADMIN_CONNECT_LOCKS[cluster_id]
+        with connect_lock:
+            # Another thread may have connected while we waited
+            with _ADMIN_CACHE_LOCK:
+                admin = _cached_admin(cluster_id, servers)
+            if admin:
+                return admin
+            admin = KafkaAdminClient(
+                bootstrap_servers=servers.split(','),
+                client_id=f'control-ui-admin-{cluster_id}',
+                request_timeout_ms=5000
+            )
+            with _ADMIN_CACHE_LOCK:
+                old = _ADMIN_CACHE.get(cluster_id)
+                _ADMIN_CACHE[cluster_id] = (admin, servers, time.time())
+            if old:
+                _retire_admin(old[0])
+            return admin
     except Exception as e:
         logger.error(f"Failed to create Kafka admin client for {cluster_id}: {e}")
         return None
 
+def evict_kafka_admin(cluster_id, admin):
+    """Drop a cached admin client after it failed so the next request reconnects.
+    Only evicts if it is still the cached one, a newer client from another thread is kept."""
+    if admin is None:
+        return
+    with _ADMIN_CACHE_LOCK:
+        entry = _ADMIN_CACHE.get(cluster_id)
+        if not entry or entry[0] is not admin:
+            return
+        del _ADMIN_CACHE[cluster_id]
+    _retire_admin(admin)
+
+@atexit.register
+def close_kafka_admins():
+    with _ADMIN_CACHE_LOCK:
+        entries = list(_ADMIN_CACHE.values())
+        _ADMIN_CACHE.clear()
+    for admin, _, _ in entries:
+        _close_admin(admin)
+
+INDEX_TEMPLATE_PATH = os.path.join(app.root_path, app.template_folder, 'index.html')
+
+@lru_cache(maxsize=4)
+def _render_index(template_mtime):
+    # Only url_for() calls in the template, so the output only changes with the file itself
+    return render_template('index.html')
+
 @app.route('/')
 def index():
     """Render main dashboard"""
-    return render_template('index.html')
+    return _render_index(os.stat(INDEX_TEMPLATE_PATH).st_mtime_ns)
 
 @app.route('/api/clusters', methods=['GET'])
 def list_clusters():
@@ -110,34 +377,19 @@ def list_clusters():
         if not os.path.exists(DOCKER_COMPOSE_PATH):
              return jsonify({'success': False, 'error': 'docker-compose.yml not found'}), 500
 
-        with open(DOCKER_COMPOSE_PATH, 'r') as f:
-            compose = yaml.safe_load(f)
-            
         clusters = {DEFAULT_CLUSTER_ID: {'name': 'Default Cluster', 'brokers': 0, 'status': 'unknown'}}
         
-        # Scan services to find clusters
-        services = compose.get('services', {})
-        for name, service in services.items():
-            if name.startswith('kafka') and name != 'kafka-ui':
-                if '-' not in name:
-                    # Default cluster (kafka1, kafka2)
-                    clusters[DEFAULT_CLUSTER_ID]['brokers'] += 1
-                else:
-                    # Named cluster: kafka-{cluster_id}-{broker_id}
-                    parts = name.split('-')
-                    if len(parts) >= 3:
-                        cluster_id = parts[1]
-                        if cluster_id not in clusters:
-                            clusters[cluster_id] = {'name': cluster_id, 'brokers': 0, 'status': 'unknown'}
-                        clusters[cluster_id]['brokers'] += 1
-
-        # Check status for each (simple check)
-        for cid, info in clusters.items():
-             # Logic to check if at least one broker is running
-             bs = get_kafka_bootstrap_servers(cid)
-             if bs:
-                 info['status'] = 'configured'
-                 # We could check actual container status here
+        # Clusters come straight from the prebuilt broker index
+        for cid, brokers in compose_brokers().items():
+            info = clusters.setdefault(cid, {'name': cid, 'brokers': 0, 'status': 'unknown'})
+            info['brokers'] = len(brokers)
+            # A cluster is "configured" once a broker advertises a PLAINTEXT listener
+            if any(b.advertised_listener for b in brokers):
+                info['status'] = 'configured'
+
+        # Default cluster always has the KAFKA_BOOTSTRAP_SERVERS fallback
+        clusters[DEFAULT_CLUSTER_ID]['status'] = 'configured'
+        # We could check actual container status here
                  
         return jsonify({'success': True, 'clusters': clusters})
     except Exception as e:
@@ -162,6 +414,26 @@ def create_cluster():
     except Exception as e:
          return jsonify({'success': False, 'error': str(e)}), 500
 
+def _remove_container(name):
+    try:
+        docker_client.containers.get(name).remove(force=True)
+        logger.info(f"Removed container {name}")
+    except docker.errors.NotFound:
+        logger.debug(f"Container {name} not found, skipping")
+    except Exception as e:
+        logger.warning(f"Could not remove container {name}: {e}")
+
+def _remove_volume(vol):
+    try:
+        # Volume names may have project prefix
+        full_vol_name = f"kafka-playground-{vol}"
+        docker_client.volumes.get(full_vol_name).remove(force=True)
+        logger.info(f"Deleted volume: {full_vol_name}")
+    except docker.errors.NotFound:
+        logger.debug(f"Volume {vol} not found, skipping")
+    except Exception as e:
+        logger.warning(f"Could not delete volume {vol}: {e}")
+
 @app.route('/api/clusters/<cluster_id>', methods=['DELETE'])
 def delete_cluster(cluster_id):
     """Delete an entire cluster"""
@@ -169,14 +441,14 @@ def delete_cluster(cluster_id):
         return jsonify({'success': False, 'error': 'Cannot delete default cluster'}), 400
         
     try:
-        with open(DOCKER_COMPOSE_PATH, 'r') as f:
-            compose = yaml.safe_load(f)
+        compose = load_compose()
             
         services_to_remove = []
         volumes_to_remove = []
         
         for name in list(compose.get('services', {}).keys()):
-             if name.startswith(f"kafka-{cluster_id}-"):
+             broker = classify_service(name)
+             if broker and broker[0] == cluster_id:
                  services_to_remove.append(name)
                  
                  # Queue volume for removal
@@ -185,18 +457,12 @@ def delete_cluster(cluster_id):
         if not services_to_remove:
             return jsonify({'success': False, 'error': 'Cluster not found'}), 404
 
+        # Kill and remove containers
+        with ThreadPoolExecutor(DOCKER_WORKERS) as ex:
+            list(ex.map(_remove_container, services_to_remove))
+
         # Remove services
         for name in services_to_remove:
-            # Stop container
-            try:
-                container = docker_client.containers.get(name)
-                container.kill()
-                logger.info(f"Stopped container {name}")
-            except docker.errors.NotFound:
-                logger.debug(f"Container {name} not found, skipping")
-            except Exception as e:
-                logger.warning(f"Could not stop container {name}: {e}")
-            
             del compose['services'][name]
             
         # Remove volumes
@@ -205,33 +471,10 @@ def delete_cluster(cluster_id):
                 del compose['volumes'][vol]
         
         save_docker_compose(compose)
-            
-        # Prune - use shell=True for better compatibility
-        try:
-            result = subprocess.run(
-                "docker-compose up -d --remove-orphans",
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd="/app",
-                timeout=60
-            )
-            if result.returncode != 0:
-                logger.warning(f"docker-compose prune returned {result.returncode}: {result.stderr}")
-        except Exception as e:
-            logger.error(f"Error running docker-compose: {e}")
         
         # Delete actual Docker volumes
-        for vol in volumes_to_remove:
-            try:
-                # Volume names may have project prefix
-                full_vol_name = f"kafka-playground-{vol}"
-                docker_client.volumes.get(full_vol_name).remove(force=True)
-                logger.info(f"Deleted volume: {full_vol_name}")
-            except docker.errors.NotFound:
-                logger.debug(f"Volume {vol} not found, skipping")
-            except Exception as e:
-                logger.warning(f"Could not delete volume {vol}: {e}")
+        with ThreadPoolExecutor(DOCKER_WORKERS) as ex:
+            list(ex.map(_remove_volume, volumes_to_remove))
         
         return jsonify({'success': True, 'message': f'Cluster {cluster_id} deleted'})
         
@@ -247,35 +490,22 @@ def get_cluster_status():
     
     try:
         # Discover containers belonging to this cluster
-        containers = {}
-        
-        # Zookeeper is shared
-        try:
-            zk = docker_client.containers.get('zookeeper')
-            containers['zookeeper'] = {'status': zk.status, 'state': zk.attrs['State']}
-        except:
-            containers['zookeeper'] = {'status': 'not_found', 'state': {}}
+        # Zookeeper is shared; it stays 'not_found' unless the listing below contains it
+        containers = {'zookeeper': {'status': 'not_found'}}
 
-        # Find brokers for this cluster
-        all_containers = docker_client.containers.list(all=True)
+        # One sparse list call covers zookeeper and this cluster's brokers; name and status come from
+        # the list payload, so no per-container inspect
+        if cluster_id == DEFAULT_CLUSTER_ID:
+            broker_pattern = r'^/?kafka\d+$'
+        else:
+            broker_pattern = f'^/?kafka-{re.escape(cluster_id)}-\\d+$'
+        all_containers = docker_client.containers.list(
+            all=True, sparse=True, filters={'name': ['^/?zookeeper$', broker_pattern]})
         for c in all_containers:
-            try:
-                # Match name
-                is_match = False
-                if cluster_id == DEFAULT_CLUSTER_ID:
-                    if c.name.startswith('kafka') and c.name != 'kafka-ui' and c.name[5:].isdigit():
-                        is_match = True
-                else:
-                     if c.name.startswith(f"kafka-{cluster_id}-"):
-                         is_match = True
-                
-                if is_match:
-                    containers[c.name] = {
-                        'status': c.status,
-                        'state': c.attrs['State']
-                    }
-            except docker.errors.NotFound:
-                continue # Container likely deleted during iteration
+            name = c.attrs['Names'][0].lstrip('/')
+            broker = classify_service(name)
+            if name == 'zookeeper' or (broker and broker[0] == cluster_id):
+                containers[name] = {'status': c.attrs['State']}
 
         # Metrics - count brokers from containers (instant) not Kafka connection
         topic_count = 0
@@ -291,8 +521,7 @@ def get_cluster_status():
                     topic_count = len([t for t in topics if not t.startswith('_')])
                 except Exception as e:
                     logger.warning(f"Kafka connection warning for {cluster_id}: {e}")
-                finally:
-                    admin.close()
+                    evict_kafka_admin(cluster_id, admin)
         
         return jsonify({
             'success': True,
@@ -307,57 +536,104 @@ def get_cluster_status():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Port management
-def is_port_available(port):
-    """Check if a port is likely available by trying to connect to it.
-    If connection is refused, port is available. If connection succeeds, port is in use.
-    Note: This works from inside Docker container to check host ports."""
+PORT_PROBE_HOST = 'host.docker.internal'  # Docker Desktop's address for the host
+PORT_PROBE_TIMEOUT = 0.1  # seconds
+PORT_PROBE_TTL = 2  # seconds a probe result is reused
+
+# Recent probe results: port -> available, valid for the time bucket they were taken in
+_PORT_PROBE_CACHE = {'bucket': None, 'results': {}, 'lock': threading.Lock()}
+
+async def _probe_port(host, port):
+    # Connection succeeded = port is in use; refused / timed out = port is available
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(0.5)
-            # Try to connect to host.docker.internal (Docker Desktop) or localhost
-            result = s.connect_ex(('host.docker.internal', port))
-            if result == 0:
-                # Connection succeeded = port is in use
-                logger.debug(f"Port {port} is in use (connection succeeded)")
-                return False
-            else:
-                # Connection refused = port is available
-                logger.debug(f"Port {port} is available (connection refused)")
-                return True
-    except socket.error as e:
-        # If we can't connect at all, assume port is available
-        logger.debug(f"Port {port} check error (assuming available): {e}")
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), PORT_PROBE_TIMEOUT)
+    except (OSError, asyncio.TimeoutError) as e:
+        logger.debug(f"Port {port} is available ({e!r})")
         return True
+    logger.debug(f"Port {port} is in use (connection succeeded)")
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return False
+
+async def _probe_ports(ports):
+    # Resolve the host once instead of once per port
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(PORT_PROBE_HOST, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+    except OSError as e:
+        # If we can't connect at all, assume ports are available
+        logger.debug(f"Cannot resolve {PORT_PROBE_HOST} (assuming ports available): {e}")
+        return [True] * len(ports)
+    host = infos[0][4][0]
+    return await asyncio.gather(*(_probe_port(host, port) for port in ports))
+
+def probe_ports(ports):
+    """Map each port to whether it looks available on the host, probing them all concurrently
+    from one event loop. Note: This works from inside Docker container to check host ports."""
+    ports = list(ports)
+    if not ports:
+        return {}
+    # Results are reused within one PORT_PROBE_TTL time bucket; a new bucket starts empty
+    bucket = int(time.monotonic() // PORT_PROBE_TTL)
+    with _PORT_PROBE_CACHE['lock']:
+        if _PORT_PROBE_CACHE['bucket'] != bucket:
+            _PORT_PROBE_CACHE['bucket'] = bucket
+            _PORT_PROBE_CACHE['results'] = {}
+        results = dict(_PORT_PROBE_CACHE['results'])
+    missing = [port for port in ports if port not in results]
+    if missing:
+        fresh = dict(zip(missing, asyncio.run(_probe_ports(missing))))
+        with _PORT_PROBE_CACHE['lock']:
+            if _PORT_PROBE_CACHE['bucket'] == bucket:
+                _PORT_PROBE_CACHE['results'].update(fresh)
+        results.update(fresh)
+    return {port: results[port] for port in ports}
 
-def get_next_free_port(compose_data, start_port=9095):
-    """Find next available port - checks docker-compose.yml for used ports"""
-    used_ports = set()
-    services = compose_data.get('services', {})
-    for s in services.values():
-        for p in s.get('ports', []):
+def index_ports(compose_data):
+    """Fixed host ports of the compose file: (port -> [service names], ports claimed more than once).
+    Ports given via env vars and container-only entries are skipped."""
+    port_usage = defaultdict(list)
+    duplicates = []  # in order of first collision
+    for service_name, service in (compose_data.get('services') or {}).items():
+        for p in service.get('ports') or []:
+            # Handle "9092:9092" or "${PORT}:9092"
+            head, sep, _ = str(p).partition(':')
+            if not sep or '$' in head:
+                continue
             try:
-                # Handle "9092:9092" or "${PORT}:9092"
-                port_str = str(p).split(':')[0]
-                if '$' in port_str: 
-                    continue  # Skip env vars
-                used_ports.add(int(port_str))
-            except Exception as e:
-                logger.debug(f"Could not parse port {p}: {e}")
+                port = int(head)
+            except ValueError:
                 continue
-    
-    candidate = start_port
-    max_attempts = 100  # Prevent infinite loop
-    
-    for _ in range(max_attempts):
-        if candidate not in used_ports:
-            # Skip actual port check from container - just check docker-compose
-            logger.info(f"Found available port: {candidate}")
-            return candidate
-        candidate += 1
-    
-    # Fallback - return the candidate
-    logger.warning(f"Could not find free port after {max_attempts} attempts, using {candidate}")
-    return candidate
+            services = port_usage[port]
+            services.append(service_name)
+            if len(services) == 2:
+                duplicates.append(port)
+    return dict(port_usage), duplicates
+
+def get_next_free_port(start_port=9095):
+    """Find next available port - checks docker-compose.yml for used ports.
+    The compose file is the single source of truth here; no live port probe is done."""
+    with _COMPOSE_CACHE['lock']:
+        _refresh_compose()
+        used_ports = _COMPOSE_CACHE['used_ports']
+        candidate = max(start_port, _COMPOSE_CACHE['next_hint'])
+        max_attempts = 100  # Prevent infinite loop
+        
+        for _ in range(max_attempts):
+            if candidate not in used_ports:
+                # Skip actual port check from container - just check docker-compose
+                logger.info(f"Found available port: {candidate}")
+                break
+            candidate += 1
+        else:
+            # Fallback - return the candidate
+            logger.warning(f"Could not find free port after {max_attempts} attempts, using {candidate}")
+        
+        _COMPOSE_CACHE['next_hint'] = candidate + 1
+        return candidate
 
 # Reuse helper
 def add_broker_internal(cluster_id):
@@ -365,31 +641,14 @@ def add_broker_internal(cluster_id):
         if not os.path.exists(DOCKER_COMPOSE_PATH):
             return jsonify({'success': False, 'error': 'docker-compose.yml not found'}), 500
 
-        with open(DOCKER_COMPOSE_PATH, 'r') as f:
-            compose = yaml.safe_load(f)
+        compose = load_compose()
 
         services = compose.get('services', {})
         
-        # Determine Naming and IDs
-        current_brokers = []
-        for s in services.keys():
-            if cluster_id == DEFAULT_CLUSTER_ID:
-                if s.startswith('kafka') and s != 'kafka-ui' and '-' not in s:
-                    current_brokers.append(s)
-            else:
-                if s.startswith(f"kafka-{cluster_id}-"):
-                    current_brokers.append(s)
-        
-        last_id = 0
-        for b in current_brokers:
-            try:
-                # kafkaN or kafka-cluster-N
-                if cluster_id == DEFAULT_CLUSTER_ID:
-                    bid = int(b.replace('kafka', ''))
-                else:
-                    bid = int(b.split('-')[-1])
-                if bid > last_id: last_id = bid
-            except: pass
+        # Determine Naming and IDs, from the same copy of the file that gets saved
+        brokers = index_brokers(compose).get(cluster_id, [])
+        current_brokers = [b.name for b in brokers]
+        last_id = max((b.broker_id for b in brokers), default=0)
             
         new_id = last_id + 1
         
@@ -402,14 +661,14 @@ def add_broker_internal(cluster_id):
             # Template: Try to copy from same cluster, else copy from default kafka1
             template_svc_name = current_brokers[0] if current_brokers else 'kafka1'
 
-        new_service = copy.deepcopy(services[template_svc_name])
+        new_service = fast_clone(services[template_svc_name])
         
         # Configuration Logic
         new_service['container_name'] = new_name
         new_service['hostname'] = new_name
         
         # Find free port
-        new_external_port = get_next_free_port(compose)
+        new_external_port = get_next_free_port()
         new_service['ports'] = [f"{new_external_port}:9092"]
         
         # Environment
@@ -443,7 +702,7 @@ def add_broker_internal(cluster_id):
                      new_volumes.append(f"{new_src}:{dest}")
                      
                      if 'volumes' not in compose: compose['volumes'] = {}
-                     compose['volumes'][new_src] = {'name': f"kafka-playground-{new_name}-data"}
+                     compose['volumes'][new_src] = {'name': f"kafka-playground-{new_name}-data", 'labels': [VOLUME_LABEL]}
                 else:
                     new_volumes.append(v)
         new_service['volumes'] = new_volumes
@@ -460,22 +719,26 @@ def add_broker_internal(cluster_id):
         save_docker_compose(compose)
 
             
-        # Up (Restart/Apply changes) - use shell=True for better compatibility
+        # Up - start the container directly via the Docker API, docker-compose is the fallback
         try:
-            result = subprocess.run(
-                "docker-compose up -d " + new_name,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd="/app",
-                timeout=60
-            )
-            if result.returncode != 0:
-                logger.warning(f"docker-compose up returned {result.returncode}: {result.stderr}")
-        except subprocess.TimeoutExpired:
-            logger.warning("docker-compose up timed out, container may still be starting")
+            run_broker_container(new_name, new_service, compose)
+            logger.info(f"Started container {new_name}")
         except Exception as e:
-            logger.error(f"Error running docker-compose: {e}")
+            logger.warning(f"Direct start of {new_name} failed ({e}), falling back to docker-compose")
+            try:
+                result = subprocess.run(
+                    [DOCKER_COMPOSE_BIN, "up", "-d", new_name],
+                    capture_output=True,
+                    text=True,
+                    cwd="/app",
+                    timeout=60
+                )
+                if result.returncode != 0:
+                    logger.warning(f"docker-compose up returned {result.returncode}: {result.stderr}")
+            except subprocess.TimeoutExpired:
+                logger.warning("docker-compose up timed out, container may still be starting")
+            except Exception as e:
+                logger.error(f"Error running docker-compose: {e}")
         
         return jsonify({
             'success': True,
@@ -487,15 +750,190 @@ def add_broker_internal(cluster_id):
         logger.error(f"Error adding broker: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-# Helper for safe writing (preserves inode for bind mounts)
+def interpolate_env(value, env):
+    """Resolve ${VAR} references the way docker-compose does. Raises KeyError for unset variables without default."""
+    def sub(m):
+        if m.group(1) in env:
+            return env[m.group(1)]
+        if m.group(2) is not None:
+            return m.group(2)
+        raise KeyError(m.group(1))
+    return _ENV_VAR_RE.sub(sub, str(value))
+
+# Service keys run_broker_container knows how to apply; anything else goes through docker-compose
+RUN_BROKER_KEYS = frozenset({
+    'image', 'container_name', 'hostname', 'ports', 'environment', 'volumes', 'networks', 'depends_on', 'restart'
+})
+
+def run_broker_container(name, service, compose_data):
+    """Create and start a broker container straight from its compose service definition.
+    Raises ValueError for anything it cannot reproduce, so the caller falls back to docker-compose."""
+    unsupported = set(service) - RUN_BROKER_KEYS
+    if unsupported:
+        raise ValueError(f"Unsupported service keys {sorted(unsupported)}")
+    if service.get('container_name', name) != name:
+        raise ValueError(f"container_name {service['container_name']} differs from service {name}")
+    services = compose_data.get('services') or {}
+    for dep in service.get('depends_on', []):
+        # Only one container is started here, its dependencies must already be up
+        dep_name = (services.get(dep) or {}).get('container_name')
+        if not dep_name or docker_client.containers.get(dep_name).status != 'running':
+            raise ValueError(f"Dependency {dep} is not running")
+
+    # Shell environment wins over .env, same as docker-compose
+    env_vars = {k: v for k, v in dotenv_values(ENV_FILE_PATH).items() if v is not None}
+    env_vars.update(os.environ)
+
+    environment = {k: interpolate_env(v, env_vars) for k, v in service.get('environment', {}).items()}
+
+    ports = {}
+    for p in service.get('ports', []):
+        host_port, container_port = interpolate_env(p, env_vars).split(':')
+        ports[f"{container_port}/tcp"] = int(host_port)
+
+    volumes = {}
+    compose_volumes = compose_data.get('volumes') or {}
+    for v in service.get('volumes', []):
+        src, dest = v.split(':', 1)
+        if src not in compose_volumes:
+            raise ValueError(f"Unsupported volume mapping {v}")
+        spec = compose_volumes[src] or {}
+        labels = spec.get('labels') or {}
+        if isinstance(labels, list):
+            labels = dict(label.partition('=')[::2] for label in labels)
+        # Create up front so the volume carries its labels (containers.run would create it bare)
+        volume = docker_client.volumes.create(name=spec.get('name', src), labels=labels)
+        volumes[volume.name] = {'bind': dest, 'mode': 'rw'}
+
+    network = None
+    if service.get('networks'):
+        net = service['networks'][0]
+        network = ((compose_data.get('networks') or {}).get(net) or {}).get('name', net)
+
+    try:
+        docker_client.containers.run(
+            image=interpolate_env(service['image'], env_vars),
+            name=name,
+            hostname=service.get('hostname', name),
+            detach=True,
+            environment=environment,
+            ports=ports,
+            volumes=volumes,
+            network=network,
+            restart_policy={'Name': service.get('restart', 'no')}
+        )
+    except Exception:
+        # Don't leave a created-but-not-started container behind to clash with the fallback
+        try:
+            docker_client.containers.get(name).remove(force=True)
+        except Exception:
+            pass
+        raise
+
+# Compose-specific YAML emitter. docker-compose.yml is nothing but nested block mappings,
+# plain lists and scalars, so the layout is written directly and PyYAML only renders (cached)
+# individual scalars. Anything outside that shape raises ValueError and is left to yaml.dump.
+@lru_cache(maxsize=4096, typed=True)
+def _yaml_scalar(value):
+    if not isinstance(value, (str, int, float, bool, type(None))):
+        raise ValueError(f"Unsupported YAML scalar type {type(value).__name__}")
+    text = yaml.dump([value], Dumper=NoAliasDumper, default_flow_style=False, width=1 << 30)
+    if not text.startswith('- ') or text.count('\n') != 1:
+        raise ValueError(f"Scalar needs multi-line YAML: {value!r}")
+    return text[2:-1]
+
+def _yaml_value(value):
+    if isinstance(value, dict) and not value:
+        return '{}'
+    if isinstance(value, list) and not value:
+        return '[]'
+    return _yaml_scalar(value)
+
+def _emit_mapping(data, indent, buf):
+    pad = ' ' * indent
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            buf.write(f"{pad}{_yaml_scalar(key)}:\n")
+            _emit_mapping(value, indent + 2, buf)
+        elif isinstance(value, list) and value:
+            # Block sequences stay at the key's indentation, like yaml.dump
+            buf.write(f"{pad}{_yaml_scalar(key)}:\n")
+            _emit_sequence(value, indent, buf)
+        else:
+            buf.write(f"{pad}{_yaml_scalar(key)}: {_yaml_value(value)}\n")
+
+def _emit_sequence(items, indent, buf):
+    pad = ' ' * indent
+    for item in items:
+        if isinstance(item, dict) and item:
+            sub = io.StringIO()
+            _emit_mapping(item, indent + 2, sub)
+            buf.write(f"{pad}- {sub.getvalue()[indent + 2:]}")
+        elif isinstance(item, list) and item:
+            raise ValueError("Nested sequences are not supported")
+        else:
+            buf.write(f"{pad}- {_yaml_value(item)}\n")
+
+def emit_compose(compose_data):
+    """Render compose data as block-style YAML (same layout as yaml.dump with default_flow_style=False)"""
+    if not isinstance(compose_data, dict):
+        raise ValueError("Compose root must be a mapping")
+    buf = io.StringIO()
+    _emit_mapping(compose_data, 0, buf)
+    return buf.getvalue()
+
+# Helper for safe writing: write a temp file and atomically rename it over docker-compose.yml.
+# When docker-compose.yml is a single-file bind mount the rename is refused (EBUSY/EXDEV), so
+# fall back to rewriting in place, which preserves the inode. Both paths hold the compose
+# cache lock, so load_compose() never sees a half-written file.
+# Cleared after the first EBUSY/EXDEV from os.replace (docker-compose.yml is a bind-mounted file)
+_COMPOSE_SAVE = {'atomic': True}
+
 def save_docker_compose(compose_data):
     try:
-        with open(DOCKER_COMPOSE_PATH, 'r+') as f:
-            f.seek(0)
-            f.truncate()
-            yaml.dump(compose_data, f, Dumper=NoAliasDumper, default_flow_style=False, sort_keys=False)
-            f.flush()
-            os.fsync(f.fileno())
+        try:
+            content = emit_compose(compose_data)
+        except ValueError as e:
+            logger.debug(f"Compose emitter fallback to yaml.dump: {e}")
+            content = yaml.dump(compose_data, Dumper=NoAliasDumper, default_flow_style=False, sort_keys=False)
+        tmp_path = DOCKER_COMPOSE_PATH + '.tmp'
+        with _COMPOSE_CACHE['lock']:
+            replaced = False
+            if _COMPOSE_SAVE['atomic']:
+                try:
+                    with open(tmp_path, 'w') as f:
+                        f.write(content)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, DOCKER_COMPOSE_PATH)
+                    # Commit the rename itself
+                    dir_fd = os.open(os.path.dirname(DOCKER_COMPOSE_PATH), os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                    replaced = True
+                except OSError as e:
+                    if e.errno not in (errno.EBUSY, errno.EXDEV):
+                        raise
+                    # A single-file bind mount never allows the rename, stop trying for this process
+                    logger.info(f"Atomic replace not possible ({e}), rewriting docker-compose.yml in place from now on")
+                    _COMPOSE_SAVE['atomic'] = False
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+            if not replaced:
+                with open(DOCKER_COMPOSE_PATH, 'r+') as f:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+            st = os.stat(DOCKER_COMPOSE_PATH)
+            write_compose_sidecar(compose_data, (st.st_mtime_ns, st.st_size))
+            # Force the next load_compose() to re-parse, even if mtime granularity hides the write
+            _COMPOSE_CACHE['key'] = None
     except Exception as e:
         logger.error(f"Error saving docker-compose: {e}")
         raise
@@ -524,8 +962,7 @@ def delete_broker(broker_id):
             return jsonify({'success': False, 'error': 'Cannot delete default brokers'}), 403
              
         # Check if exists
-        with open(DOCKER_COMPOSE_PATH, 'r') as f:
-            compose = yaml.safe_load(f)
+        compose = load_compose()
             
         if broker_name not in compose['services']:
              return jsonify({'success': False, 'error': 'Broker not found'}), 404
@@ -547,20 +984,6 @@ def delete_broker(broker_id):
              del compose['volumes'][vol_name]
              
         save_docker_compose(compose)
-            
-        try:
-            result = subprocess.run(
-                "docker-compose up -d --remove-orphans",
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd="/app",
-                timeout=60
-            )
-            if result.returncode != 0:
-                logger.warning(f"docker-compose returned {result.returncode}: {result.stderr}")
-        except Exception as e:
-            logger.error(f"Error running docker-compose: {e}")
         
         # Delete actual Docker volume
         try:
@@ -600,25 +1023,20 @@ def stop_broker(broker_id):
 @app.route('/api/topics/list', methods=['GET'])
 def list_topics():
     cluster_id = request.args.get('cluster_id', DEFAULT_CLUSTER_ID)
+    admin = None
     try:
         admin = get_kafka_admin(cluster_id)
         if not admin: return jsonify({'success': False, 'error': 'No admin'}), 500
         
-        topics = admin.list_topics()
-        user_topics = [t for t in topics if not t.startswith('_')]
-        
-        # Simplified details (count only) to speed up?
-        # Or keeping full details
-        topic_details = []
-        bs = get_kafka_bootstrap_servers(cluster_id)
-        consumer = KafkaConsumer(bootstrap_servers=bs.split(','), group_id=f'topic-list-{cluster_id}')
-        for t in user_topics:
-            p = consumer.partitions_for_topic(t)
-            topic_details.append({'name': t, 'partitions': len(p) if p else 0})
-        consumer.close()
-        admin.close()
+        # Names and partition counts of all topics in a single metadata request
+        details = admin.describe_topics()
+        topic_details = [
+            {'name': d['topic'], 'partitions': len(d['partitions'])}
+            for d in details if not d['topic'].startswith('_')
+        ]
         return jsonify({'success': True, 'topics': topic_details})
     except Exception as e:
+        evict_kafka_admin(cluster_id, admin)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/topics/create', methods=['POST'])
@@ -627,24 +1045,30 @@ def create_topic():
     cluster_id = data.get('cluster_id', DEFAULT_CLUSTER_ID)
     topic_name = data.get('name')
     # ... Use cluster_id in get_kafka_admin()
+    admin = None
     try:
          admin = get_kafka_admin(cluster_id)
          new_topic = NewTopic(name=topic_name, num_partitions=int(data.get('partitions', 3)), replication_factor=int(data.get('replication_factor', 1)))
          admin.create_topics([new_topic])
-         admin.close()
          return jsonify({'success': True})
+    except TopicAlreadyExistsError as e:
+         return jsonify({'success': False, 'error': str(e)}), 500
     except Exception as e:
+         evict_kafka_admin(cluster_id, admin)
          return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/topics/delete/<topic_name>', methods=['DELETE'])
 def delete_topic(topic_name):
     cluster_id = request.args.get('cluster_id', DEFAULT_CLUSTER_ID)
+    admin = None
     try:
         admin = get_kafka_admin(cluster_id)
         admin.delete_topics([topic_name])
-        admin.close()
         return jsonify({'success': True})
+    except UnknownTopicOrPartitionError as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
     except Exception as e:
+        evict_kafka_admin(cluster_id, admin)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/cluster/stop', methods=['POST'])
@@ -667,18 +1091,21 @@ def stop_cluster():
         for c in docker_client.containers.list(all=True):
             if c.name.startswith(f"kafka-{cluster_id}-"): containers.append(c.name)
             
-    stopped = []
-    for name in containers:
+    def stop_one(name):
         try:
             c = docker_client.containers.get(name)
             if c.status == 'running':
                 c.stop()
-                stopped.append(name)
                 logger.info(f"Stopped container {name}")
+                return name
         except docker.errors.NotFound:
             logger.debug(f"Container {name} not found")
         except Exception as e:
             logger.warning(f"Could not stop container {name}: {e}")
+        return None
+
+    with ThreadPoolExecutor(DOCKER_WORKERS) as ex:
+        stopped = [name for name in ex.map(stop_one, containers) if name]
     return jsonify({'success': True, 'stopped': stopped})
 
 @app.route('/api/cluster/start', methods=['POST'])
@@ -686,8 +1113,7 @@ def start_cluster():
     # Start all services
     try:
         result = subprocess.run(
-            "docker-compose up -d",
-            shell=True,
+            [DOCKER_COMPOSE_BIN, "up", "-d"],
             capture_output=True,
             text=True,
             cwd="/app",
@@ -702,15 +1128,11 @@ def start_cluster():
 @app.route('/api/cluster/reset', methods=['POST'])
 def reset_cluster():
     """Reset Docker setup - async background task"""
-    def run_reset():
-        logger.info("Starting background reset...")
-        time.sleep(1) # Give API time to respond
-        
-        # 1. Revert docker-compose.yml to default state (keep only default services)
+    def clean_config():
+        # Revert docker-compose.yml to default state (keep only default services)
         try:
             if os.path.exists(DOCKER_COMPOSE_PATH):
-                with open(DOCKER_COMPOSE_PATH, 'r') as f:
-                    compose = yaml.safe_load(f)
+                compose = load_compose()
                 
                 # Default services that should persist
                 defaults = ['zookeeper', 'kafka1', 'kafka2', 'kafka3', 'control-panel', 'headers', 'header-cluster', 'kafka-ui', 'jupyter', 'jupyter-kafka']
@@ -733,40 +1155,116 @@ def reset_cluster():
         except Exception as e:
             logger.error(f"Failed to clean docker-compose.yml: {e}")
 
-        # 2. Stop and Remove
+    def compose_down(compose_file=None):
+        # compose_file: snapshot to read instead of docker-compose.yml (project dir stays /app)
+        args = [DOCKER_COMPOSE_BIN]
+        if compose_file:
+            args += ["--project-directory", "/app", "-f", compose_file]
         try:
-             subprocess.run("docker-compose down -v --remove-orphans", shell=True, cwd="/app")
+             subprocess.run(args + ["down", "-v", "--remove-orphans"], cwd="/app")
         except Exception as e:
              logger.error(f"Down failed: {e}")
 
-        # 3. Prune specific resources
+    def remove_containers():
         try:
-            # Containers
-            for c in docker_client.containers.list(all=True):
-                if 'kafka-playground' in c.name or c.name.startswith('kafka'):
-                     try: c.remove(force=True)
-                     except: pass
-            
-            # Volumes
-            for v in docker_client.volumes.list():
-                if 'kafka-playground' in v.name or v.name.startswith('kafka'):
-                     try: v.remove(force=True)
-                     except: pass
-                     
-            # Networks
-            try: docker_client.networks.prune()
-            except: pass
-            
+            # Containers - let the daemon pre-filter by name, then remove in parallel
+            targets = [
+                c.name for c in docker_client.containers.list(all=True, filters={'name': ['^/?kafka', 'kafka-playground']})
+                if 'kafka-playground' in c.name or c.name.startswith('kafka')
+            ]
+            with ThreadPoolExecutor(DOCKER_WORKERS) as ex:
+                list(ex.map(_remove_container, targets))
         except Exception as e:
             logger.error(f"Prune failed: {e}")
 
-        # 4. Restart
+    def prune_volumes():
+        try:
+            # Volumes - labelled ones in one daemon-side prune. Named volumes need all=true on
+            # Docker 23+, older daemons reject that filter and prune named volumes anyway.
+            try:
+                docker_client.volumes.prune(filters={'label': VOLUME_LABEL, 'all': 'true'})
+            except docker.errors.APIError:
+                docker_client.volumes.prune(filters={'label': VOLUME_LABEL})
+
+            # Leftovers created before volumes were labelled, removed in parallel
+            def remove_volume(v):
+                try:
+                    v.remove(force=True)
+                except docker.errors.NotFound:
+                    pass  # Already gone (e.g. removed by 'down -v' or the prune above)
+                except docker.errors.APIError as e:
+                    logger.warning(f"Could not remove volume {v.name}: {e}")
+
+            # The daemon's name filter is a substring match, so 'kafka' already narrows the
+            # listing to a superset of both conditions
+            leftovers = [v for v in docker_client.volumes.list(filters={'name': 'kafka'})
+                         if 'kafka-playground' in v.name or v.name.startswith('kafka')]
+            with ThreadPoolExecutor(DOCKER_WORKERS) as ex:
+                list(ex.map(remove_volume, leftovers))
+        except Exception as e:
+            logger.error(f"Prune failed: {e}")
+
+    def prune_networks():
+        # Networks
+        try:
+            docker_client.networks.prune()
+        except docker.errors.APIError as e:
+            logger.warning(f"Network prune failed: {e}")
+
+    def restart():
         logger.info("Restarting services...")
         try:
-            subprocess.run("docker-compose up -d", shell=True, cwd="/app")
+            result = subprocess.run(
+                [DOCKER_COMPOSE_BIN, "up", "-d"],
+                cwd="/app",
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=120
+            )
+            if result.returncode != 0:
+                logger.warning(f"docker-compose up returned {result.returncode}: {result.stderr}")
+        except subprocess.TimeoutExpired:
+            logger.warning("docker-compose up timed out during reset")
         except Exception as e:
             logger.error(f"Restart failed: {e}")
 
+    def run_stage(*steps):
+        # Steps log their own errors; leaving the pool waits for all of them (stage barrier)
+        with ThreadPoolExecutor(len(steps)) as ex:
+            for step in steps:
+                ex.submit(step)
+
+    def run_reset():
+        logger.info("Starting background reset...")
+        time.sleep(1) # Give API time to respond
+        
+        # 1. Clean config and stop the stack side by side. 'down' reads a snapshot of the
+        #    current file, so the concurrent rewrite can never hand it a half-written one.
+        snapshot = None
+        try:
+            fd, snapshot = tempfile.mkstemp(suffix='.yml')
+            os.close(fd)
+            shutil.copyfile(DOCKER_COMPOSE_PATH, snapshot)
+            run_stage(clean_config, lambda: compose_down(snapshot))
+        except OSError as e:
+            logger.warning(f"Could not snapshot docker-compose.yml ({e}), cleaning config before stopping")
+            clean_config()
+            compose_down()
+        finally:
+            if snapshot:
+                try: os.unlink(snapshot)
+                except OSError: pass
+
+        # 2. Remove remaining containers (volumes can't go while containers still use them)
+        remove_containers()
+
+        # 3. Prune volumes and networks - independent of each other
+        run_stage(prune_volumes, prune_networks)
+
+        # 4. Restart
+        restart()
+
     # Start background thread
     thread = threading.Thread(target=run_reset)
     thread.start()
@@ -784,44 +1282,41 @@ def validate_config():
         if not os.path.exists(DOCKER_COMPOSE_PATH):
             return jsonify({'success': False, 'error': 'docker-compose.yml not found'}), 500
         
-        with open(DOCKER_COMPOSE_PATH, 'r') as f:
-            compose = yaml.safe_load(f)
+        # Only the services -> ports part of the file matters here; it is extracted once per
+        # parse of docker-compose.yml, so a warm validate walks nothing
+        port_usage, duplicates = compose_port_usage()
         
         issues = []
-        port_usage = {}  # port -> [service names]
-        
-        for service_name, service in compose.get('services', {}).items():
-            for p in service.get('ports', []):
-                try:
-                    port_str = p.split(':')[0]
-                    if '$' in port_str:
-                        continue
-                    port = int(port_str)
-                    if port not in port_usage:
-                        port_usage[port] = []
-                    port_usage[port].append(service_name)
-                except:
-                    continue
         
-        # Check for duplicate ports in config
-        for port, services in port_usage.items():
-            if len(services) > 1:
-                issues.append(f"Port {port} is used by multiple services: {', '.join(services)}")
+        # Report duplicate ports in config
+        for port in duplicates:
+            issues.append(f"Port {port} is used by multiple services: {', '.join(port_usage[port])}")
         
-        # Check if ports are available on host
-        for port in port_usage.keys():
-            if not is_port_available(port):
+        # Check if ports are available on host - probe concurrently, report in config order
+        for port, available in probe_ports(port_usage).items():
+            if not available:
                 issues.append(f"Port {port} is already in use on the host system")
         
         return jsonify({
             'success': True,
             'valid': len(issues) == 0,
             'issues': issues,
-            'port_map': {str(k): v for k, v in port_usage.items()}
+            'port_map': port_usage  # int keys serialize as JSON strings, no rebuild needed
         })
     except Exception as e:
         logger.error(f"Error validating config: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Warm the compose cache at startup: the JSON sidecar (or one YAML parse) is loaded and the
+# port map, used ports and broker index are derived before the first request arrives
+try:
+    with _COMPOSE_CACHE['lock']:
+        _refresh_compose()
+except (OSError, ValueError, yaml.YAMLError) as e:
+    logger.warning(f"Could not preload docker-compose.yml: {e}")
+
+# Served by gunicorn in the container (see Dockerfile). One worker process with threads:
+# compose writes, the port hint and the Docker event watcher are per-process state.
+# use: gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 app:app
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)